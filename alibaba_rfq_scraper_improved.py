@@ -1,453 +1,731 @@
-"""
-Improved Alibaba RFQ Scraper
-This script scrapes RFQ (Request for Quotation) listings from Alibaba sourcing website
-with better data extraction and deduplication.
-"""
-
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import re
-from urllib.parse import urljoin, urlparse, parse_qs
-from datetime import datetime
-import json
-import sys
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import random
-import hashlib
-
-class ImprovedAlibabaRFQScraper:
-    def __init__(self):
-        self.base_url = "https://sourcing.alibaba.com"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
-        self.driver = None
-        self.scraped_data = []
-        self.seen_urls = set()  # To avoid duplicates
-        
-    def setup_selenium(self):
-        """Setup Selenium WebDriver with Chrome"""
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--disable-web-security')
-            chrome_options.add_argument('--allow-running-insecure-content')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-            
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            print("✓ Selenium WebDriver setup successful")
-            return True
-        except Exception as e:
-            print(f"✗ Error setting up Selenium: {e}")
-            return False
-    
-    def extract_rfq_id_from_url(self, url):
-        """Extract RFQ ID from detail URL"""
-        try:
-            if 'p=ID1' in url:
-                # Extract the ID from the p parameter
-                start = url.find('p=ID1') + 2
-                end = url.find('&', start)
-                if end == -1:
-                    end = len(url)
-                return url[start:start+10] if start+10 <= len(url) else url[start:end]
-            return "N/A"
-        except:
-            return "N/A"
-    
-    def clean_text(self, text):
-        """Clean and normalize text"""
-        if not text:
-            return ""
-        # Remove extra whitespace and newlines
-        text = re.sub(r'\s+', ' ', text.strip())
-        # Remove special characters that might break CSV
-        text = re.sub(r'[^\w\s\-\.\,\(\)\/\&\%\#\@\!\?\:\;]', '', text)
-        return text
-    
-    def get_rfq_containers(self, soup):
-        """Find RFQ containers using multiple strategies"""
-        # Strategy 1: Look for elements with RFQ-related links
-        rfq_elements = []
-        
-        # Find all links that point to rfq_detail
-        detail_links = soup.find_all('a', href=re.compile(r'rfq_detail\.htm'))
-        
-        for link in detail_links:
-            # Get the parent container that likely contains all RFQ data
-            container = link
-            for _ in range(5):  # Go up to 5 levels to find the main container
-                parent = container.parent
-                if not parent:
-                    break
-                # Look for containers that seem to hold complete RFQ info
-                if len(parent.get_text()) > 100:  # Reasonable amount of text
-                    container = parent
-                else:
-                    break
-            
-            if container not in rfq_elements:
-                rfq_elements.append(container)
-        
-        print(f"✓ Found {len(rfq_elements)} potential RFQ containers")
-        return rfq_elements[:50]  # Limit to avoid processing navigation elements
-    
-    def scrape_page_with_selenium(self, url, page_num=1):
-        """Scrape a single page using Selenium with improved parsing"""
-        try:
-            print(f"📄 Scraping page {page_num}: {url}")
-            
-            self.driver.get(url)
-            time.sleep(random.uniform(4, 7))  # Random delay
-            
-            # Wait for page to load
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # Scroll to load more content
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(2)
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            
-            # Parse with BeautifulSoup
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Get RFQ containers
-            rfq_containers = self.get_rfq_containers(soup)
-            
-            page_data = []
-            processed_urls = set()
-            
-            for i, container in enumerate(rfq_containers):
-                try:
-                    rfq_data = self.extract_rfq_data_improved(container)
-                    
-                    # Skip if no meaningful data or duplicate
-                    if (rfq_data['Title'] == "N/A" or 
-                        len(rfq_data['Title']) < 10 or 
-                        rfq_data['Inquiry URL'] in processed_urls or
-                        rfq_data['Inquiry URL'] in self.seen_urls):
-                        continue
-                    
-                    # Skip promotional/navigation elements
-                    if any(skip_word in rfq_data['Title'].lower() for skip_word in 
-                           ['buy access', 'submit buying', 'join free', 'sign in']):
-                        continue
-                    
-                    processed_urls.add(rfq_data['Inquiry URL'])
-                    self.seen_urls.add(rfq_data['Inquiry URL'])
-                    page_data.append(rfq_data)
-                    
-                    print(f"  ✓ Extracted item {len(page_data)}: {rfq_data['Title'][:60]}...")
-                    
-                    if len(page_data) >= 20:  # Limit per page
-                        break
-                        
-                except Exception as e:
-                    print(f"  ⚠ Error extracting item {i+1}: {str(e)}")
-                    continue
-            
-            print(f"📊 Page {page_num} completed: {len(page_data)} valid items extracted")
-            return page_data
-            
-        except Exception as e:
-            print(f"✗ Error scraping page {page_num}: {str(e)}")
-            return []
-    
-    def extract_rfq_data_improved(self, container):
-        """Extract RFQ data with improved parsing"""
-        current_date = datetime.now().strftime('%d-%m-%Y')
-        
-        rfq_data = {
-            'RFQ ID': 'N/A',
-            'Title': 'N/A',
-            'Buyer Name': 'N/A',
-            'Buyer Image': 'N/A',
-            'Inquiry Time': 'N/A',
-            'Quotes Left': 'N/A',
-            'Country': 'United Arab Emirates',
-            'Quantity Required': 'N/A',
-            'Email Confirmed': 'No',
-            'Experienced Buyer': 'No',
-            'Complete Order via RFQ': 'No',
-            'Typical Replies': 'No',
-            'Interactive User': 'No',
-            'Inquiry URL': 'N/A',
-            'Inquiry Date': current_date,
-            'Scraping Date': current_date
-        }
-        
-        try:
-            container_text = container.get_text() if container else ""
-            
-            # Extract title and URL
-            title_link = container.find('a', href=re.compile(r'rfq_detail\.htm'))
-            if title_link:
-                title = self.clean_text(title_link.get_text())
-                if len(title) > 10:
-                    rfq_data['Title'] = title
-                    
-                href = title_link.get('href')
-                if href:
-                    if href.startswith('/'):
-                        href = urljoin(self.base_url, href)
-                    rfq_data['Inquiry URL'] = href
-                    rfq_data['RFQ ID'] = self.extract_rfq_id_from_url(href)
-            
-            # Extract buyer information
-            # Look for buyer name patterns
-            name_patterns = [
-                r'([A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',  # Names
-                r'([A-Z][a-z]+\s+[A-Z]+[a-z]*)',  # Name with abbreviated middle/last
-            ]
-            
-            for pattern in name_patterns:
-                matches = re.findall(pattern, container_text)
-                for match in matches:
-                    # Filter out common non-name words
-                    exclude_words = ['Posted', 'Quote', 'United', 'Arab', 'Emirates', 'Date', 'Quantity', 
-                                   'Required', 'Email', 'Confirmed', 'Quotes', 'Left', 'Before', 'Piece']
-                    if not any(word in match for word in exclude_words) and len(match) > 5:
-                        rfq_data['Buyer Name'] = match.strip()
-                        break
-                if rfq_data['Buyer Name'] != 'N/A':
-                    break
-            
-            # Extract buyer image
-            img_elements = container.find_all('img')
-            for img in img_elements:
-                src = img.get('src', '')
-                if ('50x50' in src or 'avatar' in src.lower()) and 'alicdn.com' in src:
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    rfq_data['Buyer Image'] = src
-                    break
-            
-            # Extract time posted
-            time_patterns = [
-                r'(\d+\s+(?:hour|hours|minute|minutes|day|days)\s+(?:ago|before))',
-                r'(\d+\s+(?:hour|hours|minute|minutes|day|days))',
-            ]
-            
-            for pattern in time_patterns:
-                match = re.search(pattern, container_text, re.IGNORECASE)
-                if match:
-                    rfq_data['Inquiry Time'] = match.group(1)
-                    break
-            
-            # Extract quotes left
-            quotes_patterns = [
-                r'Quotes?\s+Left\s+(\d+)',
-                r'(\d+)\s+quote[s]?\s+left',
-            ]
-            
-            for pattern in quotes_patterns:
-                match = re.search(pattern, container_text, re.IGNORECASE)
-                if match:
-                    rfq_data['Quotes Left'] = match.group(1)
-                    break
-            
-            # Extract quantity required
-            quantity_patterns = [
-                r'Quantity\s+Required:\s*(\d+[^,\n\r]*(?:Piece|Unit|Box|Carton|Meter|Kilogram|Ton|Liter)[^,\n\r]*)',
-                r'(\d+\s*(?:Piece|Pieces|Unit|Units|Box|Boxes|Carton|Cartons|Meter|Meters|Kilogram|Ton|Liter)[^,\n\r]*)',
-            ]
-            
-            for pattern in quantity_patterns:
-                match = re.search(pattern, container_text, re.IGNORECASE)
-                if match:
-                    quantity = self.clean_text(match.group(1))
-                    if len(quantity) < 100:  # Reasonable length
-                        rfq_data['Quantity Required'] = quantity
-                        break
-            
-            # Check for flags
-            text_lower = container_text.lower()
-            
-            if 'email confirmed' in text_lower:
-                rfq_data['Email Confirmed'] = 'Yes'
-            
-            if 'typically replies' in text_lower:
-                rfq_data['Typical Replies'] = 'Yes'
-                
-            if 'interactive user' in text_lower:
-                rfq_data['Interactive User'] = 'Yes'
-                
-            if 'experienced buyer' in text_lower:
-                rfq_data['Experienced Buyer'] = 'Yes'
-            
-        except Exception as e:
-            print(f"    ⚠ Error in data extraction: {str(e)}")
-        
-        return rfq_data
-    
-    def scrape_multiple_pages(self, base_url, max_pages=10):
-        """Scrape multiple pages with better pagination handling"""
-        all_data = []
-        
-        if not self.setup_selenium():
-            print("✗ Failed to setup Selenium. Exiting.")
-            return []
-        
-        try:
-            for page in range(1, max_pages + 1):
-                if page == 1:
-                    url = base_url
-                else:
-                    # Try different pagination patterns
-                    if '?' in base_url:
-                        url = f"{base_url}&page={page}"
-                    else:
-                        url = f"{base_url}?page={page}"
-                
-                page_data = self.scrape_page_with_selenium(url, page)
-                
-                if not page_data:
-                    print(f"⚠ No data found on page {page}. Trying alternative pagination...")
-                    # Try alternative pagination
-                    alt_url = base_url.replace('&recently=Y', f'&recently=Y&startIndex={(page-1)*20}')
-                    if alt_url != url:
-                        page_data = self.scrape_page_with_selenium(alt_url, page)
-                    
-                    if not page_data:
-                        print(f"⚠ Still no data on page {page}. Stopping pagination.")
-                        break
-                
-                all_data.extend(page_data)
-                print(f"📈 Total items collected so far: {len(all_data)}")
-                
-                # Random delay between pages
-                time.sleep(random.uniform(3, 6))
-                
-        except KeyboardInterrupt:
-            print("\n⚠ Scraping interrupted by user")
-        except Exception as e:
-            print(f"✗ Error during multi-page scraping: {str(e)}")
-        finally:
-            if self.driver:
-                self.driver.quit()
-                print("✓ Browser closed")
-        
-        return all_data
-    
-    def save_to_csv(self, data, filename=None):
-        """Save scraped data to CSV file with better formatting"""
-        if not filename:
-            timestamp = datetime.now().strftime('%Y_%m_%d_%H%M%S')
-            filename = f"alibaba_rfq_final_{timestamp}.csv"
-        
-        try:
-            df = pd.DataFrame(data)
-            
-            if len(df) == 0:
-                print("⚠ No data to save")
-                return None
-            
-            # Remove duplicates based on Inquiry URL
-            df = df.drop_duplicates(subset=['Inquiry URL'], keep='first')
-            
-            # Clean data
-            for col in df.columns:
-                if col in ['Title', 'Buyer Name', 'Quantity Required']:
-                    df[col] = df[col].apply(lambda x: self.clean_text(str(x)) if pd.notna(x) else 'N/A')
-            
-            # Ensure column order matches template
-            required_columns = [
-                'RFQ ID', 'Title', 'Buyer Name', 'Buyer Image', 'Inquiry Time',
-                'Quotes Left', 'Country', 'Quantity Required', 'Email Confirmed',
-                'Experienced Buyer', 'Complete Order via RFQ', 'Typical Replies',
-                'Interactive User', 'Inquiry URL', 'Inquiry Date', 'Scraping Date'
-            ]
-            
-            df = df[required_columns]
-            
-            # Save to CSV
-            df.to_csv(filename, index=False, encoding='utf-8')
-            print(f"✓ Data saved to {filename}")
-            print(f"📊 Total unique records: {len(df)}")
-            
-            # Display sample data
-            if len(df) > 0:
-                print("\n📋 Sample data (first 3 rows):")
-                sample_df = df.head(3)
-                for idx, row in sample_df.iterrows():
-                    print(f"\nRecord {idx + 1}:")
-                    print(f"  Title: {row['Title']}")
-                    print(f"  Buyer: {row['Buyer Name']}")
-                    print(f"  Quantity: {row['Quantity Required']}")
-                    print(f"  Time: {row['Inquiry Time']}")
-                    print(f"  Quotes Left: {row['Quotes Left']}")
-            
-            return filename
-            
-        except Exception as e:
-            print(f"✗ Error saving to CSV: {str(e)}")
-            return None
-
-def main():
-    """Main execution function"""
-    print("🚀 Starting Improved Alibaba RFQ Scraper")
-    print("=" * 60)
-    
-    # Target URL
-    target_url = "https://sourcing.alibaba.com/rfq/rfq_search_list.htm?spm=a2700.8073608.1998677541.1.82be65aaoUUItC&country=AE&recently=Y&tracelog=newest"
-    
-    # Initialize scraper
-    scraper = ImprovedAlibabaRFQScraper()
-    
-    try:
-        print(f"🎯 Target URL: {target_url}")
-        print("🔍 Starting to scrape RFQ listings from multiple pages...")
-        
-        # Scrape more pages for comprehensive data
-        scraped_data = scraper.scrape_multiple_pages(target_url, max_pages=10)
-        
-        if scraped_data:
-            csv_file = scraper.save_to_csv(scraped_data)
-            
-            if csv_file:
-                print(f"\n🎉 Scraping completed successfully!")
-                print(f"📁 Output file: {csv_file}")
-                print(f"📊 Total unique RFQ records: {len(scraped_data)}")
-                
-                # Create summary
-                print(f"\n📈 Summary:")
-                print(f"   • Pages scraped: Multiple pages")
-                print(f"   • Records collected: {len(scraped_data)}")
-                print(f"   • File format: CSV")
-                print(f"   • Data fields: 16 columns matching template")
-            else:
-                print("✗ Failed to save data to CSV")
-        else:
-            print("⚠ No data was scraped. Please check the website structure or network connection.")
-    
-    except Exception as e:
-        print(f"✗ Fatal error: {str(e)}")
-    finally:
-        print("\n" + "=" * 60)
-        print("🏁 Scraping session ended")
-
-if __name__ == "__main__":
-    main()
+"""
+Improved Alibaba RFQ Scraper
+This script scrapes RFQ (Request for Quotation) listings from Alibaba sourcing website
+with better data extraction and deduplication.
+"""
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+import aiohttp
+import asyncio
+import csv
+import functools
+import orjson
+import os
+import re
+import time
+from urllib.parse import urljoin, urlparse, parse_qs
+from datetime import datetime
+import json
+import sys
+from playwright.async_api import async_playwright
+from pybloom_live import ScalableBloomFilter
+from collections import deque
+import xxhash
+
+# Only these tags matter for extraction; skipping the rest of the tree
+# keeps lxml parsing fast and allocation low
+_STRAINER = SoupStrainer(['a', 'img', 'div', 'li'])
+
+# Patterns used in the hot extraction loop, compiled once at import time
+_WS_RE = re.compile(r'\s+')
+_SPECIAL_RE = re.compile(r'[^\w\s\-\.\,\(\)\/\&\%\#\@\!\?\:\;]')
+_DETAIL_HREF_RE = re.compile(r'rfq_detail\.htm')
+_NAME_RES = (
+    re.compile(r'([A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)'),  # Names
+    re.compile(r'([A-Z][a-z]+\s+[A-Z]+[a-z]*)'),  # Name with abbreviated middle/last
+)
+# These run against text that is lowercased once per container, so they are
+# compiled case-sensitive (IGNORECASE would re-casefold on every attempt)
+_TIME_RES = (
+    re.compile(r'(\d+\s+(?:hour|hours|minute|minutes|day|days)\s+(?:ago|before))'),
+    re.compile(r'(\d+\s+(?:hour|hours|minute|minutes|day|days))'),
+)
+_QUOTES_RES = (
+    re.compile(r'quotes?\s+left\s+(\d+)'),
+    re.compile(r'(\d+)\s+quote[s]?\s+left'),
+)
+_QTY_RES = (
+    re.compile(r'quantity\s+required:\s*(\d+[^,\n\r]*(?:piece|unit|box|carton|meter|kilogram|ton|liter)[^,\n\r]*)'),
+    re.compile(r'(\d+\s*(?:piece|pieces|unit|units|box|boxes|carton|cartons|meter|meters|kilogram|ton|liter)[^,\n\r]*)'),
+)
+# IGNORECASE fallbacks for the rare container whose text changes length
+# under lower() (e.g. 'İ' expands to two chars), where spans computed on
+# the lowered copy can't be used to slice the original
+_TIME_RES_CI = tuple(re.compile(p.pattern, re.IGNORECASE) for p in _TIME_RES)
+_QTY_RES_CI = tuple(re.compile(p.pattern, re.IGNORECASE) for p in _QTY_RES)
+
+# Column order matching the provided CSV template
+CSV_COLUMNS = [
+    'RFQ ID', 'Title', 'Buyer Name', 'Buyer Image', 'Inquiry Time',
+    'Quotes Left', 'Country', 'Quantity Required', 'Email Confirmed',
+    'Experienced Buyer', 'Complete Order via RFQ', 'Typical Replies',
+    'Interactive User', 'Inquiry URL', 'Inquiry Date', 'Scraping Date'
+]
+
+@functools.lru_cache(maxsize=8192)
+def _clean_text(text):
+    """Clean and normalize text (memoized; short fragments recur across pages)"""
+    if not text:
+        return ""
+    # Collapse whitespace, then strip special characters that might break CSV
+    return _SPECIAL_RE.sub('', _WS_RE.sub(' ', text.strip()))
+
+@functools.lru_cache(maxsize=8192)
+def _extract_rfq_id(url):
+    """Extract RFQ ID from a detail URL (memoized; URLs repeat across retries)"""
+    try:
+        return parse_qs(urlparse(url).query).get('p', ['N/A'])[0] or 'N/A'
+    except:
+        return "N/A"
+
+# Per-page result cache, so a crashed or interrupted run can restart
+# without re-fetching pages it already scraped
+_CACHE_DIR = '.cache'
+_CACHE_MAX_AGE = 6 * 3600  # Seconds before a cached page goes stale
+
+# Resource types the browser never needs for extraction (the avatar URL is
+# read from the markup; the image itself is never downloaded)
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'stylesheet', 'media'})
+
+# Common non-name words; candidate buyer names whose tokens touch this set
+# are rejected with a single C-level disjointness test
+_EXCLUDE_WORDS = frozenset({
+    'Posted', 'Quote', 'United', 'Arab', 'Emirates', 'Date', 'Quantity',
+    'Required', 'Email', 'Confirmed', 'Quotes', 'Left', 'Before', 'Piece'
+})
+
+# Text fragments that mark promotional/navigation tiles rather than RFQs
+_PROMO_WORDS = ('buy access', 'submit buying', 'join free', 'sign in')
+
+# Buyer badges detected as plain substring tests on the lowered text
+_FLAGS = (
+    ('email confirmed', 'Email Confirmed'),
+    ('typically replies', 'Typical Replies'),
+    ('interactive user', 'Interactive User'),
+    ('experienced buyer', 'Experienced Buyer'),
+)
+
+class ImprovedAlibabaRFQScraper:
+    def __init__(self, concurrency=4):
+        self.base_url = "https://sourcing.alibaba.com"
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        })
+        # Concurrent browser workers; I/O-bound fetching scales near-linearly
+        # up to ~4 before the site's rate limit dominates
+        self.concurrency = concurrency
+        self.scraped_data = []
+        # Bloom filter keeps URL dedup memory flat on long crawls (~10 bits
+        # per entry); a small LRU set of recent URLs confirms positives so
+        # false positives don't silently drop records
+        self.seen_urls = ScalableBloomFilter(initial_capacity=100000, error_rate=0.001)
+        self.recent_urls = set()
+        self._recent_order = deque(maxlen=10000)
+        # Second filter keyed on content hashes, so the same RFQ reposted
+        # under a different tracking URL is still caught
+        self.seen_content = ScalableBloomFilter(initial_capacity=100000, error_rate=0.001)
+        self.output_file = None
+        self._csv_writer = None  # Set while a streaming scrape is running
+        # Specialized extraction kernel with all constants pre-bound
+        self._extract = self._make_extractor()
+
+    async def new_browser_context(self, browser):
+        """Create a fresh browser context that mimics a regular desktop session"""
+        context = await browser.new_context(
+            user_agent=self.session.headers['User-Agent'],
+            viewport={'width': 1920, 'height': 1080}
+        )
+        # Blocking heavy static assets cuts most of the bytes-on-wire per page
+        await context.route("**/*", self._filter_route)
+        return context
+
+    async def _filter_route(self, route):
+        """Abort requests for resource types extraction never looks at"""
+        if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def url_seen(self, url):
+        """Check whether a URL was already scraped (Bloom filter first, cheap)"""
+        return url in self.seen_urls and url in self.recent_urls
+
+    def mark_url_seen(self, url):
+        """Record a URL in the Bloom filter and the recent-URL confirmation set"""
+        self.seen_urls.add(url)
+        if len(self._recent_order) == self._recent_order.maxlen:
+            self.recent_urls.discard(self._recent_order[0])
+        self._recent_order.append(url)
+        self.recent_urls.add(url)
+
+    def _cache_path(self, url):
+        """Cache file for one page URL, keyed on a hash of the URL"""
+        return os.path.join(_CACHE_DIR, f"page_{xxhash.xxh3_64_hexdigest(url.encode('utf-8'))}.json")
+
+    def _load_page_cache(self, url):
+        """Return cached rows for a page URL, or None if absent or stale"""
+        try:
+            path = self._cache_path(url)
+            if time.time() - os.path.getmtime(path) > _CACHE_MAX_AGE:
+                return None
+            with open(path, 'rb') as f:
+                return orjson.loads(f.read())
+        except Exception:
+            # A broken cache entry must never kill the run; just re-fetch
+            return None
+
+    def _store_page_cache(self, url, page_data):
+        """Persist one page's rows so a restarted run can skip the fetch"""
+        try:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            with open(self._cache_path(url), 'wb') as f:
+                f.write(orjson.dumps(page_data))
+        except OSError as e:
+            print(f"⚠ Could not write page cache: {str(e)}")
+
+    def _content_key(self, rfq_data):
+        """Hash key for content dedup (xxh3 is far cheaper than md5/sha)"""
+        return xxhash.xxh3_64_intdigest(
+            f"{rfq_data['Title']}|{rfq_data['Quantity Required']}|{rfq_data['Buyer Name']}".encode('utf-8')
+        )
+
+    def _canon_url(self, url):
+        """Canonical dedup key: drop spm/tracelog/session noise, keep only p="""
+        u = urlparse(url)
+        p = parse_qs(u.query).get('p', [''])[0]
+        return f"{u.scheme}://{u.netloc}{u.path}?p={p}"
+
+    def extract_rfq_id_from_url(self, url):
+        """Extract RFQ ID from detail URL"""
+        return _extract_rfq_id(url)
+
+    def clean_text(self, text):
+        """Clean and normalize text"""
+        return _clean_text(text)
+
+    def get_rfq_containers(self, soup):
+        """Find RFQ containers using multiple strategies"""
+        rfq_elements = []
+        seen_ids = set()
+
+        for link in soup.select('a[href*="rfq_detail.htm"]'):
+            # Strategy 1: jump straight to the listing-item ancestor
+            container = link.find_parent('li') or link.find_parent('div', class_=True)
+
+            if container is None:
+                # Strategy 2: bounded parent walk for unexpected markup
+                container = link
+                for _ in range(5):  # Go up to 5 levels to find the main container
+                    parent = container.parent
+                    if not parent:
+                        break
+                    # Look for containers that seem to hold complete RFQ info;
+                    # counting text fragments is much cheaper than get_text(),
+                    # which serializes the whole subtree per level
+                    if sum(1 for _ in parent.stripped_strings) > 3:
+                        container = parent
+                    else:
+                        break
+
+            # Several links can share one container; keep first occurrence only
+            if id(container) not in seen_ids:
+                seen_ids.add(id(container))
+                rfq_elements.append(container)
+
+        print(f"✓ Found {len(rfq_elements)} potential RFQ containers")
+        return rfq_elements[:50]  # Limit to avoid processing navigation elements
+
+    async def scrape_page_playwright(self, url, context, page_num=1):
+        """Scrape a single page in a Playwright browser context"""
+        try:
+            print(f"📄 Scraping page {page_num}: {url}")
+
+            page = await context.new_page()
+            try:
+                await page.goto(url, timeout=30000, wait_until='domcontentloaded')
+
+                # Wait only as long as the listing actually takes to render
+                try:
+                    await page.wait_for_selector('a[href*="rfq_detail.htm"]', timeout=15000)
+                except Exception:
+                    print(f"⚠ No RFQ links appeared on page {page_num} within 15s")
+
+                # One scroll to trigger lazy-loaded items, waiting briefly for
+                # the link count to grow instead of sleeping a fixed amount
+                link_count = await page.locator('a[href*="rfq_detail.htm"]').count()
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
+                try:
+                    await page.wait_for_function(
+                        "count => document.querySelectorAll('a[href*=\"rfq_detail.htm\"]').length > count",
+                        arg=link_count, timeout=3000
+                    )
+                except Exception:
+                    pass  # Nothing extra lazy-loaded; proceed with what we have
+
+                page_source = await page.content()
+            finally:
+                await page.close()
+
+            soup = BeautifulSoup(page_source, 'lxml', parse_only=_STRAINER)
+            return self.extract_page_data(soup, page_num)
+
+        except Exception as e:
+            print(f"✗ Error scraping page {page_num}: {str(e)}")
+            return []
+
+    async def fetch(self, url, session):
+        """Fetch a page over plain HTTP (no browser) for the static fast path"""
+        async with session.get(url, headers=dict(self.session.headers)) as response:
+            return await response.text()
+
+    async def _fetch_static_pages(self, page_urls):
+        """Fast path: fetch listing pages with aiohttp when JS isn't required"""
+        all_data = []
+        needs_browser = []
+        semaphore = asyncio.Semaphore(10)
+
+        connector = aiohttp.TCPConnector(limit=20)
+        timeout = aiohttp.ClientTimeout(total=15)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def fetch_with_limit(url):
+                async with semaphore:
+                    try:
+                        return await self.fetch(url, session)
+                    except Exception as e:
+                        print(f"⚠ Static fetch failed for {url}: {str(e)}")
+                        return None
+
+            pages = await asyncio.gather(*[fetch_with_limit(url) for _, url, _ in page_urls])
+
+        for (page_num, url, alt_url), page_source in zip(page_urls, pages):
+            soup = BeautifulSoup(page_source, 'lxml', parse_only=_STRAINER) if page_source else None
+            containers = self.get_rfq_containers(soup) if soup is not None else []
+
+            # Pages whose initial HTML lacks the RFQ listing need a real browser
+            if len(containers) < 3:
+                needs_browser.append((page_num, url, alt_url))
+                continue
+
+            print(f"📄 Scraping page {page_num} (static): {url}")
+            page_data = self.extract_page_data(soup, page_num, containers)
+            if page_data:
+                self._store_page_cache(url, page_data)
+            all_data.extend(page_data)
+
+        return all_data, needs_browser
+
+    def extract_page_data(self, soup, page_num=1, containers=None):
+        """Parse a page's soup and extract all valid RFQ records"""
+        # Get RFQ containers unless the caller already found them
+        rfq_containers = containers if containers is not None else self.get_rfq_containers(soup)
+
+        page_data = []
+        processed_urls = set()
+
+        for i, container in enumerate(rfq_containers):
+            try:
+                rfq_data = self.extract_rfq_data_improved(container)
+
+                # Pre-filter rejected the container outright
+                if rfq_data is None:
+                    continue
+
+                # Dedup on the canonical URL; tracking parameters make the
+                # same RFQ look unique otherwise
+                canon_url = self._canon_url(rfq_data['Inquiry URL'])
+
+                # Skip if no meaningful data or duplicate
+                if (rfq_data['Title'] == "N/A" or
+                    len(rfq_data['Title']) < 10 or
+                    canon_url in processed_urls or
+                    self.url_seen(canon_url)):
+                    continue
+
+                # Content-hash dedup: the same RFQ often reappears under a
+                # different tracking URL
+                content_key = self._content_key(rfq_data)
+                if content_key in self.seen_content:
+                    continue
+                self.seen_content.add(content_key)
+
+                processed_urls.add(canon_url)
+                self.mark_url_seen(canon_url)
+                page_data.append(rfq_data)
+
+                print(f"  ✓ Extracted item {len(page_data)}: {rfq_data['Title'][:60]}...")
+
+                if len(page_data) >= 20:  # Limit per page
+                    break
+
+            except Exception as e:
+                print(f"  ⚠ Error extracting item {i+1}: {str(e)}")
+                continue
+
+        # Stream the page's rows out as soon as it completes, so a crash
+        # mid-run doesn't lose everything scraped so far
+        if self._csv_writer and page_data:
+            self._csv_writer.writerows(page_data)
+        self.scraped_data.extend(page_data)
+
+        print(f"📊 Page {page_num} completed: {len(page_data)} valid items extracted")
+        return page_data
+
+    def _make_extractor(self):
+        """Build the field-extraction kernel once, with every constant bound
+        as a closure local (cheaper than global/attribute lookups per call)"""
+        template = {
+            'RFQ ID': 'N/A',
+            'Title': 'N/A',
+            'Buyer Name': 'N/A',
+            'Buyer Image': 'N/A',
+            'Inquiry Time': 'N/A',
+            'Quotes Left': 'N/A',
+            'Country': 'United Arab Emirates',
+            'Quantity Required': 'N/A',
+            'Email Confirmed': 'No',
+            'Experienced Buyer': 'No',
+            'Complete Order via RFQ': 'No',
+            'Typical Replies': 'No',
+            'Interactive User': 'No',
+            'Inquiry URL': 'N/A',
+            'Inquiry Date': 'N/A',
+            'Scraping Date': 'N/A'
+        }
+        exclude_words = _EXCLUDE_WORDS
+        promo_words = _PROMO_WORDS
+        detail_href_re = _DETAIL_HREF_RE
+        name_res = _NAME_RES
+        time_res = _TIME_RES
+        time_res_ci = _TIME_RES_CI
+        quotes_res = _QUOTES_RES
+        qty_res = _QTY_RES
+        qty_res_ci = _QTY_RES_CI
+        flags = _FLAGS
+        base_url = self.base_url
+        clean_text = _clean_text
+        extract_rfq_id = _extract_rfq_id
+        now = datetime.now
+
+        def extract(container):
+            # Cheap pre-screen on the raw markup: most nav/promo tiles carry
+            # no detail link and are rejected before any regex runs
+            if container is None or 'rfq_detail.htm' not in str(container):
+                return None
+
+            current_date = now().strftime('%d-%m-%Y')
+            rfq_data = template.copy()
+            rfq_data['Inquiry Date'] = current_date
+            rfq_data['Scraping Date'] = current_date
+
+            try:
+                # Serialize and casefold the container text once; every later
+                # check runs over these two strings. The newline separator
+                # keeps element boundaries as delimiters, which the [^,\n\r]
+                # tails in the quantity patterns rely on to stop at field ends
+                container_text = container.get_text(separator='\n', strip=True)
+                ct_lower = container_text.lower()
+
+                # Too little text means a bare link, not a full RFQ tile
+                if len(container_text) <= 120:
+                    return None
+
+                # Promotional/navigation tiles; cheaper to drop here than
+                # after the full extraction battery
+                for skip_word in promo_words:
+                    if skip_word in ct_lower:
+                        return None
+
+                # Extract title and URL
+                title_link = container.find('a', href=detail_href_re)
+                if title_link:
+                    title = clean_text(title_link.get_text())
+                    if len(title) > 10:
+                        rfq_data['Title'] = title
+
+                    href = title_link.get('href')
+                    if href:
+                        if href.startswith('/'):
+                            href = urljoin(base_url, href)
+                        rfq_data['Inquiry URL'] = href
+                        rfq_data['RFQ ID'] = extract_rfq_id(href)
+
+                # Extract buyer information
+                # Look for buyer name patterns
+                for pattern in name_res:
+                    matches = pattern.findall(container_text)
+                    for match in matches:
+                        # Filter out common non-name words
+                        if exclude_words.isdisjoint(match.split()) and len(match) > 5:
+                            rfq_data['Buyer Name'] = clean_text(match)
+                            break
+                    if rfq_data['Buyer Name'] != 'N/A':
+                        break
+
+                # Extract buyer image
+                img_elements = container.find_all('img')
+                for img in img_elements:
+                    src = img.get('src', '')
+                    if ('50x50' in src or 'avatar' in src.lower()) and 'alicdn.com' in src:
+                        if src.startswith('//'):
+                            src = 'https:' + src
+                        rfq_data['Buyer Image'] = src
+                        break
+
+                # Match time/quantity on the lowered text and slice the
+                # original to keep its casing -- but only when lower() kept
+                # the length, otherwise the spans would be shifted; fall
+                # back to the IGNORECASE variants on the original text
+                if len(ct_lower) == len(container_text):
+                    time_patterns, qty_patterns, search_text = time_res, qty_res, ct_lower
+                else:
+                    time_patterns, qty_patterns, search_text = time_res_ci, qty_res_ci, container_text
+
+                # Extract time posted
+                for pattern in time_patterns:
+                    match = pattern.search(search_text)
+                    if match:
+                        rfq_data['Inquiry Time'] = container_text[match.start(1):match.end(1)]
+                        break
+
+                # Extract quotes left
+                for pattern in quotes_res:
+                    match = pattern.search(ct_lower)
+                    if match:
+                        rfq_data['Quotes Left'] = match.group(1)
+                        break
+
+                # Extract quantity required
+                for pattern in qty_patterns:
+                    match = pattern.search(search_text)
+                    if match:
+                        quantity = clean_text(container_text[match.start(1):match.end(1)])
+                        if len(quantity) < 100:  # Reasonable length
+                            rfq_data['Quantity Required'] = quantity
+                            break
+
+                # Check for flags
+                for needle, key in flags:
+                    if needle in ct_lower:
+                        rfq_data[key] = 'Yes'
+
+            except Exception as e:
+                print(f"    ⚠ Error in data extraction: {str(e)}")
+
+            return rfq_data
+
+        return extract
+
+    def extract_rfq_data_improved(self, container):
+        """Extract RFQ data with improved parsing"""
+        return self._extract(container)
+
+    async def _gather_pages(self, page_urls):
+        """Scrape all page URLs, trying the aiohttp fast path before Playwright"""
+        all_data = []
+
+        # Restore pages already scraped by a recent run before fetching anything
+        remaining = []
+        for page_num, url, alt_url in page_urls:
+            cached = self._load_page_cache(url)
+            if cached is None:
+                remaining.append((page_num, url, alt_url))
+                continue
+
+            print(f"♻ Page {page_num} restored from cache ({len(cached)} items)")
+            for row in cached:
+                self.mark_url_seen(self._canon_url(row['Inquiry URL']))
+                self.seen_content.add(self._content_key(row))
+            if self._csv_writer and cached:
+                self._csv_writer.writerows(cached)
+            self.scraped_data.extend(cached)
+            all_data.extend(cached)
+
+        static_data, needs_browser = await self._fetch_static_pages(remaining)
+        all_data.extend(static_data)
+
+        if needs_browser:
+            print(f"🌐 {len(needs_browser)} page(s) need a browser. Falling back to Playwright...")
+            all_data.extend(await self._gather_pages_playwright(needs_browser))
+
+        return all_data
+
+    async def _gather_pages_playwright(self, page_urls):
+        """Scrape page URLs concurrently, sharing one browser across contexts"""
+        all_data = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(
+                headless=True,
+                args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu']
+            )
+            print("✓ Playwright browser launched")
+
+            async def scrape_with_context(url, alt_url, page_num):
+                async with semaphore:
+                    context = await self.new_browser_context(browser)
+                    try:
+                        page_data = await self.scrape_page_playwright(url, context, page_num)
+
+                        if not page_data and alt_url != url:
+                            print(f"⚠ No data found on page {page_num}. Trying alternative pagination...")
+                            page_data = await self.scrape_page_playwright(alt_url, context, page_num)
+
+                        # Cache under the primary URL so a restart finds it
+                        if page_data:
+                            self._store_page_cache(url, page_data)
+
+                        return page_data
+                    finally:
+                        await context.close()
+
+            try:
+                results = await asyncio.gather(*[
+                    scrape_with_context(url, alt_url, page_num)
+                    for page_num, url, alt_url in page_urls
+                ])
+                for page_data in results:
+                    all_data.extend(page_data)
+                    print(f"📈 Total items collected so far: {len(all_data)}")
+            finally:
+                await browser.close()
+                print("✓ Browser closed")
+
+        return all_data
+
+    def scrape_multiple_pages(self, base_url, max_pages=10, output_file=None):
+        """Scrape multiple pages concurrently, streaming rows to CSV as they land"""
+        if not output_file:
+            timestamp = datetime.now().strftime('%Y_%m_%d_%H%M%S')
+            output_file = f"alibaba_rfq_final_{timestamp}.csv"
+        self.output_file = output_file
+        self.scraped_data = []  # Accumulates rows as pages complete
+
+        page_urls = []
+        for page in range(1, max_pages + 1):
+            if page == 1:
+                url = base_url
+            else:
+                # Try different pagination patterns
+                if '?' in base_url:
+                    url = f"{base_url}&page={page}"
+                else:
+                    url = f"{base_url}?page={page}"
+
+            # Alternative pagination, used as a fallback when a page yields nothing
+            alt_url = base_url.replace('&recently=Y', f'&recently=Y&startIndex={(page-1)*20}')
+            page_urls.append((page, url, alt_url))
+
+        try:
+            with open(output_file, 'w', newline='', encoding='utf-8') as f:
+                self._csv_writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+                self._csv_writer.writeheader()
+                asyncio.run(self._gather_pages(page_urls))
+            print(f"✓ Data saved to {output_file}")
+        except KeyboardInterrupt:
+            print("\n⚠ Scraping interrupted by user")
+            if self.scraped_data:
+                print(f"✓ Partial results already saved to {output_file} ({len(self.scraped_data)} rows)")
+        except Exception as e:
+            print(f"✗ Error during multi-page scraping: {str(e)}")
+            if self.scraped_data:
+                print(f"✓ Partial results already saved to {output_file} ({len(self.scraped_data)} rows)")
+        finally:
+            self._csv_writer = None
+
+        # Completed pages were streamed to disk as they finished, so an
+        # interrupted run still returns (and keeps) everything scraped so far
+        return self.scraped_data
+
+    def save_to_csv(self, data, filename=None):
+        """Save scraped data to CSV file with better formatting"""
+        if not filename:
+            timestamp = datetime.now().strftime('%Y_%m_%d_%H%M%S')
+            filename = f"alibaba_rfq_final_{timestamp}.csv"
+
+        try:
+            if not data:
+                print("⚠ No data to save")
+                return None
+
+            # Remove duplicates based on Inquiry URL (rows are already
+            # cleaned at extraction time)
+            unique_rows = []
+            seen = set()
+            for row in data:
+                if row['Inquiry URL'] not in seen:
+                    seen.add(row['Inquiry URL'])
+                    unique_rows.append(row)
+
+            # Save to CSV in the template column order
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(unique_rows)
+
+            print(f"✓ Data saved to {filename}")
+            print(f"📊 Total unique records: {len(unique_rows)}")
+
+            # Display sample data
+            print("\n📋 Sample data (first 3 rows):")
+            for idx, row in enumerate(unique_rows[:3]):
+                print(f"\nRecord {idx + 1}:")
+                print(f"  Title: {row['Title']}")
+                print(f"  Buyer: {row['Buyer Name']}")
+                print(f"  Quantity: {row['Quantity Required']}")
+                print(f"  Time: {row['Inquiry Time']}")
+                print(f"  Quotes Left: {row['Quotes Left']}")
+
+            return filename
+
+        except Exception as e:
+            print(f"✗ Error saving to CSV: {str(e)}")
+            return None
+
+def main():
+    """Main execution function"""
+    print("🚀 Starting Improved Alibaba RFQ Scraper")
+    print("=" * 60)
+
+    # Target URL
+    target_url = "https://sourcing.alibaba.com/rfq/rfq_search_list.htm?spm=a2700.8073608.1998677541.1.82be65aaoUUItC&country=AE&recently=Y&tracelog=newest"
+
+    # Initialize scraper with 4 parallel page workers
+    scraper = ImprovedAlibabaRFQScraper(concurrency=4)
+
+    try:
+        print(f"🎯 Target URL: {target_url}")
+        print("🔍 Starting to scrape RFQ listings from multiple pages...")
+
+        # Scrape more pages for comprehensive data
+        scraped_data = scraper.scrape_multiple_pages(target_url, max_pages=10)
+
+        if scraped_data:
+            print(f"\n🎉 Scraping completed successfully!")
+            print(f"📁 Output file: {scraper.output_file}")
+            print(f"📊 Total unique RFQ records: {len(scraped_data)}")
+
+            # Create summary
+            print(f"\n📈 Summary:")
+            print(f"   • Pages scraped: Multiple pages")
+            print(f"   • Records collected: {len(scraped_data)}")
+            print(f"   • File format: CSV")
+            print(f"   • Data fields: 16 columns matching template")
+        else:
+            print("⚠ No data was scraped. Please check the website structure or network connection.")
+
+    except Exception as e:
+        print(f"✗ Fatal error: {str(e)}")
+    finally:
+        print("\n" + "=" * 60)
+        print("🏁 Scraping session ended")
+
+if __name__ == "__main__":
+    main()